@@ -6,7 +6,10 @@ export async function POST(request: Request) {
 
         const pythonResponse = await fetch("http://127.0.0.1:8000/chat", {
             method: "POST",
-            headers: { "Content-Type": "application/json" },
+            headers: {
+                "Content-Type": "application/json",
+                Authorization: request.headers.get("Authorization") || "",
+            },
             body: JSON.stringify(body),
         });
 
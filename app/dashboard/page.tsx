@@ -2,7 +2,7 @@
 
 import { useState, useEffect } from "react";
 import { useRouter } from "next/navigation";
-import { UserButton, useUser, SignOutButton } from "@clerk/nextjs";
+import { UserButton, useUser, useAuth, SignOutButton } from "@clerk/nextjs";
 import { BrainCircuit, Target, Sun, Moon, Zap, Download, FileText, BookOpen, GraduationCap, Briefcase, Trophy, LayoutDashboard, Compass, History, Clock, Lock, Sparkles, ArrowRight, LogOut, Loader2, X, MessageSquare, Send, Bot, PlayCircle, Award, ExternalLink, Flame, CheckCircle2, AlertCircle } from "lucide-react";
 import Link from "next/link";
 import VoiceMentorCall from "../components/VoiceMentorCall";
@@ -11,6 +11,7 @@ import confetti from "canvas-confetti";
 export default function Dashboard() {
   const router = useRouter();
   const { isLoaded, user } = useUser();
+  const { getToken } = useAuth();
   const [isDark, setIsDark] = useState(false); 
   const [mounted, setMounted] = useState(false);
   
@@ -256,9 +257,13 @@ export default function Dashboard() {
     setIsChatLoading(true);
 
     try {
+      const token = await getToken();
       const response = await fetch("http://localhost:8000/chat", {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: {
+          "Content-Type": "application/json",
+          ...(token ? { Authorization: `Bearer ${token}` } : {})
+        },
         body: JSON.stringify({
           message: chatMessage,
           cluster: topCluster,
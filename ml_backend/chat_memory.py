@@ -0,0 +1,185 @@
+import threading
+from collections import OrderedDict
+
+# Rough Llama-3 estimate (~4 characters per token). Good enough for budgeting
+# without pulling a tokenizer into the serving path.
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text):
+    return len(text or "") // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+def clean_history(history):
+    turns = []
+    for msg in history or []:
+        if not isinstance(msg, dict):
+            continue
+        role = msg.get("role")
+        content = str(msg.get("content", "")).strip()
+        if role in ("user", "assistant") and content:
+            turns.append({"role": role, "content": content})
+    return turns
+
+
+def compact_turns(previous_summary, turns, max_tokens):
+    # Fallback used when the LLM summarizer is unavailable: keep one short
+    # line per turn, newest last, and cut from the oldest side.
+    lines = [previous_summary] if previous_summary else []
+    for turn in turns:
+        speaker = "Student" if turn["role"] == "user" else "Disha"
+        lines.append(f"{speaker}: {turn['content'][:160]}")
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    summary = "\n".join(lines)
+    return summary[-max_chars:]
+
+
+def turn_tokens(turns):
+    return sum(estimate_tokens(t["content"]) for t in turns)
+
+
+def build_chat_messages(system_prompt, context, summary, turns, user_message, token_budget=None):
+    # The persona prompt always goes first and never changes, so the provider
+    # can reuse the cached prefix. Per-user context and the rolling summary go
+    # right after it, then the recent turns. With a token_budget, older turns
+    # that do not fit are left out (used for the stateless client history).
+    context_text = context
+    if summary:
+        context_text += f"\n\nSUMMARY OF THE CONVERSATION SO FAR:\n{summary}"
+
+    recent = turns
+    if token_budget is not None:
+        used = estimate_tokens(system_prompt) + estimate_tokens(context_text) + estimate_tokens(user_message)
+        recent = []
+        for turn in reversed(turns):
+            cost = estimate_tokens(turn["content"])
+            if used + cost > token_budget:
+                break
+            recent.append(turn)
+            used += cost
+        recent.reverse()
+
+    return (
+        [{"role": "system", "content": system_prompt},
+         {"role": "system", "content": context_text}]
+        + recent
+        + [{"role": "user", "content": user_message}]
+    )
+
+
+class ConversationStore:
+    """Per-user chat turns plus a rolling summary, kept within a token budget.
+
+    Every stored turn is sent with the next prompt, so a turn is always either
+    in the prompt or already folded into the summary. Once summary and turns
+    outgrow the budget left after the fixed prompt parts, compact() summarizes
+    the oldest turns until the kept ones fit in half of that space. The gap
+    between the two marks means summarization runs every few turns, not on
+    every reply.
+
+    In-process only. Callers must key it on an authenticated user id, since
+    seed() trusts the history it is given.
+    """
+
+    def __init__(self, token_budget=3000, summary_tokens=300, max_users=5000):
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+
+    def _session(self, user_id):
+        session = self._sessions.get(user_id)
+        if session is None:
+            session = {"summary": "", "turns": [], "compacting": False, "reserved_tokens": 0}
+            self._sessions[user_id] = session
+            while len(self._sessions) > self.max_users:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(user_id)
+        return session
+
+    def _history_budget(self, session):
+        # Tokens left for summary + turns after the persona, context and the
+        # next user message, as measured on the last prompt.
+        return max(0, self.token_budget - session["reserved_tokens"])
+
+    def seed(self, user_id, history):
+        # After a server restart the store is empty while the browser still
+        # holds the chat, so adopt the client's history once.
+        with self._lock:
+            session = self._session(user_id)
+            if not session["turns"] and not session["summary"]:
+                session["turns"] = clean_history(history)
+
+    def build_messages(self, user_id, system_prompt, context, user_message):
+        with self._lock:
+            session = self._session(user_id)
+            summary = session["summary"]
+            turns = list(session["turns"])
+            session["reserved_tokens"] = (estimate_tokens(system_prompt) + estimate_tokens(context)
+                                          + estimate_tokens(user_message))
+        # While a compaction is still running the prompt may briefly exceed
+        # the budget; dropping unsummarized turns would lose them for good.
+        return build_chat_messages(system_prompt, context, summary, turns, user_message)
+
+    def append(self, user_id, role, content):
+        with self._lock:
+            self._session(user_id)["turns"].append({"role": role, "content": content})
+
+    def needs_compaction(self, user_id):
+        # Claims the session for a single background compaction at a time.
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None or session["compacting"] or len(session["turns"]) < 2:
+                return False
+            used = estimate_tokens(session["summary"]) + turn_tokens(session["turns"])
+            if used <= self._history_budget(session):
+                return False
+            session["compacting"] = True
+            return True
+
+    def compact(self, user_id, summarize=None):
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is None:
+                return
+            previous_summary = session["summary"]
+            turns = session["turns"]
+            keep_budget = max(0, (self._history_budget(session) - self.summary_tokens) // 2)
+
+            # Keep the newest turns that fit in the low-water mark (always at
+            # least the latest one) and summarize everything older.
+            kept, used = 0, 0
+            for turn in reversed(turns):
+                cost = estimate_tokens(turn["content"])
+                if kept and used + cost > keep_budget:
+                    break
+                kept += 1
+                used += cost
+            old_turns = turns[:len(turns) - kept]
+
+        try:
+            if not old_turns:
+                return
+            summary = None
+            if summarize:
+                try:
+                    summary = summarize(previous_summary, old_turns)
+                except Exception as e:
+                    print("Chat Summary Error:", e)
+            if not summary:
+                summary = compact_turns(previous_summary, old_turns, self.summary_tokens)
+
+            with self._lock:
+                # Turns that arrived while summarizing stay untouched.
+                session["summary"] = summary[-self.summary_tokens * CHARS_PER_TOKEN:]
+                session["turns"] = session["turns"][len(old_turns):]
+        finally:
+            with self._lock:
+                session["compacting"] = False
+
+    def clear(self, user_id):
+        with self._lock:
+            self._sessions.pop(user_id, None)
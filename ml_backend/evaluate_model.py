@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -5,30 +6,61 @@ import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+from streaming import FEATURES, TARGET, iter_chunks, split_chunks, fit_forest_streaming, evaluate_streaming, report_from_confusion,\
+    add_stream_arguments, stream_forest_options, print_training_summary
+
+parser = argparse.ArgumentParser(description="Evaluate the ApniDisha career cluster model.")
+parser.add_argument("--data", default="apnidisha_mega_dataset.csv")
+add_stream_arguments(parser)
+args = parser.parse_args()
 
 print("Starting ApniDisha ML Model Evaluation...")
 
-df = pd.read_csv("apnidisha_mega_dataset.csv")
-X = df[["R", "I", "A", "S", "E", "C", "Openness", "Conscientiousness", "Extraversion", "Agreeableness", "Neuroticism"]]
-y = df["career_cluster"]
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+if args.stream:
+    print(f"Streaming '{args.data}' in chunks of {args.chunk_size:,} rows (80/20 split per chunk)...")
+    train_chunks = split_chunks(iter_chunks(args.data, args.chunk_size), part="train")
+    rf_model, train_stats = fit_forest_streaming(train_chunks, **stream_forest_options(args))
+    test_chunks = split_chunks(iter_chunks(args.data, args.chunk_size), part="test")
+    cm, test_stats = evaluate_streaming(rf_model, test_chunks)
+    accuracy = np.trace(cm) / cm.sum()
+    features = pd.Index(FEATURES)
+
+    print(f"Trained on a sample of {train_stats['sampled_rows']:,} out of {train_stats['rows']:,} profiles, "
+          f"Tested on {test_stats['rows']:,} unseen profiles.")
+    print_training_summary(train_stats)
+    print(f"Scoring throughput: {test_stats['rows_per_sec']:,.0f} rows/sec ({test_stats['seconds']:.1f}s)")
+    if test_stats["unseen_rows"]:
+        print(f"WARNING: {test_stats['unseen_rows']:,} test rows belong to clusters the model never saw and were not scored.")
+    if test_stats["peak_memory_mb"]:
+        print(f"Peak memory: {test_stats['peak_memory_mb']:.0f} MB")
+else:
+    df = pd.read_csv(args.data)
+    X = df[FEATURES]
+    y = df[TARGET]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    print(f"Training on {len(X_train)} profiles, Testing on {len(X_test)} unseen profiles...")
+    rf_model = RandomForestClassifier(n_estimators=100, max_depth=args.max_depth,
+                                      min_samples_leaf=args.min_samples_leaf or 1, random_state=42)
+    rf_model.fit(X_train, y_train)
+    y_pred = rf_model.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    cm = confusion_matrix(y_test, y_pred)
+    features = X.columns
 
-print(f"Training on {len(X_train)} profiles, Testing on {len(X_test)} unseen profiles...")
-rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
-rf_model.fit(X_train, y_train)
-y_pred = rf_model.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
 print("\n" + "="*50)
 print(f"OVERALL MODEL ACCURACY: {accuracy * 100:.2f}%")
 print("="*50)
 
 print("\n DETAILED CLASSIFICATION REPORT:")
-print(classification_report(y_test, y_pred))
+if args.stream:
+    print(report_from_confusion(cm, list(rf_model.classes_)))
+else:
+    print(classification_report(y_test, y_pred))
 
 
 print("Generating Confusion Matrix...")
 plt.figure(figsize=(12, 8))
-cm = confusion_matrix(y_test, y_pred)
 sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', 
             xticklabels=rf_model.classes_, 
             yticklabels=rf_model.classes_,
@@ -47,7 +79,6 @@ plt.figure(figsize=(10, 6))
 
 importances = rf_model.feature_importances_
 indices = np.argsort(importances)[::-1]
-features = X.columns
 
 sns.barplot(x=importances[indices], y=features[indices], hue=features[indices], palette='magma', legend=False)
 
@@ -0,0 +1,74 @@
+import argparse
+import gzip
+import time
+import numpy as np
+import pandas as pd
+from streaming import FEATURES, TARGET
+
+parser = argparse.ArgumentParser(description="Generate a synthetic ApniDisha career dataset for scaling tests.")
+parser.add_argument("--rows", type=int, default=1_000_000, help="Number of rows to generate.")
+parser.add_argument("--chunk-size", type=int, default=250_000, help="Rows generated and written per chunk.")
+parser.add_argument("--source", default="apnidisha_mega_dataset.csv", help="Real dataset the profiles are fitted on.")
+parser.add_argument("--out", default="apnidisha_synthetic_dataset.csv.gz", help="Output file (.gz is gzip-compressed).")
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+print(f"🚀 Step 1: Fitting career profiles from '{args.source}'...")
+df = pd.read_csv(args.source)
+
+# One multivariate normal per career keeps the trait correlations inside each
+# career, and careers are drawn with their real frequency, so cluster sizes
+# and overlaps match the source data.
+profiles = []
+for (career_name, career_cluster), group in df.groupby(["career_name", TARGET]):
+    values = group[FEATURES].to_numpy(dtype=np.float64)
+    cov = np.cov(values, rowvar=False) if len(values) > 1 else np.zeros((len(FEATURES), len(FEATURES)))
+    profiles.append({
+        "career_name": career_name,
+        "career_cluster": career_cluster,
+        "mean": values.mean(axis=0),
+        "cov": cov,
+        "weight": len(values),
+    })
+
+weights = np.array([p["weight"] for p in profiles], dtype=np.float64)
+weights /= weights.sum()
+low = df[FEATURES].min().to_numpy()
+high = df[FEATURES].max().to_numpy()
+print(f"   {len(profiles)} careers across {df[TARGET].nunique()} clusters.")
+
+rng = np.random.default_rng(args.seed)
+
+def generate_chunk(n_rows):
+    career_ids = rng.choice(len(profiles), size=n_rows, p=weights)
+    traits = np.empty((n_rows, len(FEATURES)), dtype=np.int8)
+    names = np.empty(n_rows, dtype=object)
+    clusters = np.empty(n_rows, dtype=object)
+
+    for idx in np.unique(career_ids):
+        rows = np.flatnonzero(career_ids == idx)
+        profile = profiles[idx]
+        samples = rng.multivariate_normal(profile["mean"], profile["cov"], size=len(rows), method="eigh")
+        traits[rows] = np.clip(np.rint(samples), low, high)
+        names[rows] = profile["career_name"]
+        clusters[rows] = profile["career_cluster"]
+
+    chunk = pd.DataFrame(traits, columns=FEATURES)
+    chunk.insert(0, TARGET, clusters)
+    chunk.insert(0, "career_name", names)
+    return chunk
+
+print(f"🧬 Step 2: Streaming {args.rows:,} rows to '{args.out}'...")
+start = time.perf_counter()
+opener = gzip.open if args.out.endswith(".gz") else open
+written = 0
+
+with opener(args.out, "wt", newline="") as f:
+    while written < args.rows:
+        n_rows = min(args.chunk_size, args.rows - written)
+        generate_chunk(n_rows).to_csv(f, header=(written == 0), index=False)
+        written += n_rows
+        print(f"   {written:,} / {args.rows:,} rows")
+
+seconds = time.perf_counter() - start
+print(f"✅ SUCCESS! {written:,} rows in {seconds:.1f}s ({written / seconds:,.0f} rows/sec).")
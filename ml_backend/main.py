@@ -1,22 +1,29 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Header
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
+from typing import Optional
 from psycopg2.pool import ThreadedConnectionPool
 from fastapi.middleware.cors import CORSMiddleware
 import random
 import joblib
-import numpy as np
 import pandas as pd
 import os
 from dotenv import load_dotenv
 from groq import Groq
 import re
 import json
+import hmac
+import jwt
+from chat_memory import ConversationStore, build_chat_messages, clean_history
+from profiler import profiler, profile_request
+from quiz_logic import CATEGORIES, BASE_STEPS, TOTAL_STEPS, predict_clusters
 
 load_dotenv()
 app = FastAPI()
+ALLOWED_ORIGINS = ["http://localhost:3000"]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000"],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -50,7 +57,7 @@ print("Loading ApniDisha Custom ML Model & Mega Dataset...")
 
 try:
     rf_model = joblib.load("apnidisha_model.pkl")
-    df_careers = pd.read_csv("apnidisha_mega_dataset.csv")
+    df_careers = pd.read_csv(os.getenv("CAREERS_DATASET", "apnidisha_mega_dataset.csv"))
 
     new_careers = pd.DataFrame([
         {"career_name": "Lead Actor", "career_cluster": "Arts & Design", "R": 2, "I": 2, "A": 10, "S": 8, "E": 6, "C": 2, "Openness": 9, "Conscientiousness": 5, "Extraversion": 10, "Agreeableness": 7, "Neuroticism": 6},
@@ -95,6 +102,11 @@ class JobDetailRequest(BaseModel):
     title: str
     cluster: str 
 
+class ProfilerConfigRequest(BaseModel):
+    enabled: Optional[bool] = None
+    threshold_ms: Optional[int] = None
+    interval_ms: Optional[int] = None
+
 CLUSTER_IMAGES = {
     "Realistic": ["photo-1581092918056-0c4c3acd3789", "photo-1498084393753-b411b2d26b34"], 
     "Investigative": ["photo-1532094349884-543bc11b234d", "photo-1635070041078-e363dbe005cb"], 
@@ -128,15 +140,6 @@ def get_relevant_image(key):
     chosen_id = random.choice(image_ids)
     return f"https://images.unsplash.com/{chosen_id}?auto=format&fit=crop&w=800&q=80"
 
-def derive_personality_traits(scores):
-    openness = min(10, (scores.get("Artistic", 0) + scores.get("Investigative", 0)) / 2 + 3)
-    conscientiousness = min(10, scores.get("Conventional", 0) + 4)
-    extraversion = min(10, (scores.get("Enterprising", 0) + scores.get("Social", 0)) / 2 + 2)
-    agreeableness = min(10, scores.get("Social", 0) + 5)
-    neuroticism = 4 
-    return [openness, conscientiousness, extraversion, agreeableness, neuroticism]
-
-
 BASE_QUESTIONS = {
     "Realistic": [
         "I would love a job where I can work with my hands, fix things, or build machines.",
@@ -171,12 +174,12 @@ BASE_QUESTIONS = {
 }
 
 @app.post("/predict-career")
+@profile_request
 def predict_career_adaptive(req: AdaptiveQuizRequest):
     step = req.step
     
-    if step <= 6:
-        categories = ["Realistic", "Investigative", "Artistic", "Social", "Enterprising", "Conventional"]
-        target_category = categories[step - 1]
+    if step <= BASE_STEPS:
+        target_category = CATEGORIES[step - 1]
         question = random.choice(BASE_QUESTIONS[target_category])
         
         return {
@@ -190,48 +193,15 @@ def predict_career_adaptive(req: AdaptiveQuizRequest):
         }
 
     try:
-        r = req.scores.get("Realistic", 0)
-        i_trait = req.scores.get("Investigative", 0)
-        a = req.scores.get("Artistic", 0)
-        s = req.scores.get("Social", 0)
-        e = req.scores.get("Enterprising", 0)
-        c_trait = req.scores.get("Conventional", 0)
-        
-        personality_traits = derive_personality_traits(req.scores)
-        features = np.array([[r, i_trait, a, s, e, c_trait] + personality_traits])
-        probabilities = rf_model.predict_proba(features)[0]
+        riasec = [[req.scores.get(cat, 0) for cat in CATEGORIES]]
         classes = rf_model.classes_
-        
-        calibrated_probs = []
-        for i, cls_name in enumerate(classes):
-            base_prob = probabilities[i]
-            pref_score = req.cluster_prefs.get(cls_name, 0)
-            
-            if pref_score < 0:
-                multiplier = (0.8) ** abs(pref_score)
-                base_prob *= multiplier
-            elif pref_score > 0:
-                multiplier = (1.15) ** pref_score 
-                base_prob *= multiplier
-                
-            calibrated_probs.append(base_prob)
-            
-        best_idx = np.argmax(calibrated_probs)
-        predicted_cluster = classes[best_idx]
-        
-        total_prob = sum(calibrated_probs)
-        if total_prob == 0:
-            final_percentage = 85.5 
-        else:
-            final_percentage = (calibrated_probs[best_idx] / total_prob) * 100
-        
-        if final_percentage > 98.0:
-            noise = (len(predicted_cluster) % 15) / 10.0
-            final_percentage = 96.8 + noise
-            
-        confidence_val = round(float(final_percentage), 1)
+        prefs = [[req.cluster_prefs.get(cls_name, 0) for cls_name in classes]]
+
+        best_idx, _, confidence = predict_clusters(rf_model, riasec, prefs)
+        predicted_cluster = classes[best_idx[0]]
+        confidence_val = float(confidence[0])
 
-        if step > 20:
+        if step > TOTAL_STEPS:
             top_careers = []
             
             if 'df_careers' in globals():
@@ -389,6 +359,7 @@ async def save_profile(profile: UserProfile):
             release_db_connection(conn)
 
 @app.post("/api/roadmap")
+@profile_request
 def generate_roadmap(req: RoadmapRequest):
     try:
         if not groq_api_key:
@@ -435,6 +406,7 @@ def generate_roadmap(req: RoadmapRequest):
         ]}
 
 @app.post("/api/get-colleges")
+@profile_request
 def get_colleges(req: CollegeFilterRequest):
     conn = None
     try:
@@ -492,15 +464,7 @@ def get_colleges(req: CollegeFilterRequest):
         if conn:
             release_db_connection(conn)
 
-@app.post("/chat")
-async def chat_with_disha(request_data: dict):
-    
-    user_grade = request_data.get("grade", "10th Grade") 
-    user_city = request_data.get("city", "India")
-    target_trait = request_data.get("trait", "Career")
-    user_message = request_data.get("message", "Hello!")
-
-    system_prompt = f"""
+DISHA_SYSTEM_PROMPT = """
     You are 'Disha', the official AI Career Mentor for the platform ApniDisha.
 
     YOUR PERSONA:
@@ -508,30 +472,96 @@ async def chat_with_disha(request_data: dict):
     2. Your tone is warm, encouraging, and Gen-Z relatable (use phrases like "Awesome!", "Don't worry", "Let's figure this out").
     3. NEVER sound like a strict teacher, a boring robotic counselor, or Wikipedia.
     4. Always validate the student's feelings before asking the next question.
+    """
+
+# Conversation memory is per process: with several uvicorn workers each one
+# keeps its own copy, and a worker that already holds a session ignores newer
+# history sent by the client. Run /chat on a single worker.
+chat_memory = ConversationStore(token_budget=int(os.getenv("CHAT_TOKEN_BUDGET", "3000")))
+
+CLERK_JWKS_URL = os.getenv("CLERK_JWKS_URL")
+clerk_jwks = jwt.PyJWKClient(CLERK_JWKS_URL) if CLERK_JWKS_URL else None
+if not clerk_jwks:
+    print("WARNING: CLERK_JWKS_URL not set, chat memory is disabled!")
+
+def get_verified_user_id(authorization):
+    # Server-side memory is only keyed on a verified Clerk session token,
+    # never on an id the client puts in the request body.
+    if not clerk_jwks or not authorization or not authorization.startswith("Bearer "):
+        return ""
+    token = authorization[len("Bearer "):]
+    try:
+        signing_key = clerk_jwks.get_signing_key_from_jwt(token)
+        claims = jwt.decode(token, signing_key.key, algorithms=["RS256"])
+    except jwt.PyJWTError as e:
+        print("Clerk Token Error:", e)
+        return ""
+    if claims.get("azp") and claims["azp"] not in ALLOWED_ORIGINS:
+        return ""
+    return claims.get("sub", "")
+
+def summarize_chat_turns(previous_summary, turns):
+    transcript = "\n".join(
+        f"{'Student' if t['role'] == 'user' else 'Disha'}: {t['content']}" for t in turns
+    )
+    prompt = f"""Update the running summary of a career mentoring chat between a student and 'Disha'.
+    Keep the student's goals, interests, worries, grades and any advice already given. Max 120 words. Output only the summary.
+
+    CURRENT SUMMARY:
+    {previous_summary or "None"}
+
+    NEW MESSAGES:
+    {transcript}"""
+
+    chat_completion = client.chat.completions.create(
+        messages=[{"role": "user", "content": prompt}],
+        model="llama-3.1-8b-instant",
+        temperature=0.2,
+        max_tokens=200
+    )
+    return chat_completion.choices[0].message.content.strip()
+
+@app.post("/chat")
+async def chat_with_disha(request_data: dict, background_tasks: BackgroundTasks, authorization: str = Header(None)):
+    
+    user_grade = request_data.get("grade", "10th Grade") 
+    user_city = request_data.get("city", "India")
+    target_trait = request_data.get("trait", "Career")
+    user_message = request_data.get("message", "Hello!")
+    user_id = get_verified_user_id(authorization)
 
+    context = f"""
     CURRENT CONTEXT:
     The user is a student in {user_grade} from {user_city}. 
     Respond to the user keeping your persona active.
     """
 
+    if user_id:
+        chat_memory.seed(user_id, request_data.get("history", []))
+        messages = chat_memory.build_messages(user_id, DISHA_SYSTEM_PROMPT, context, user_message)
+    else:
+        messages = build_chat_messages(
+            DISHA_SYSTEM_PROMPT, context, "", clean_history(request_data.get("history", [])),
+            user_message, chat_memory.token_budget
+        )
+
     chat_completion = client.chat.completions.create(
-        messages=[
-            {
-                "role": "system",
-                "content": system_prompt
-            },
-            {
-                "role": "user",
-                "content": user_message
-            }
-        ],
+        messages=messages,
         model="llama-3.1-8b-instant",
         temperature=0.7,
     )
     reply = chat_completion.choices[0].message.content
+
+    if user_id:
+        chat_memory.append(user_id, "user", user_message)
+        chat_memory.append(user_id, "assistant", reply)
+        if chat_memory.needs_compaction(user_id):
+            background_tasks.add_task(chat_memory.compact, user_id, summarize_chat_turns)
+
     return {"success": True, "reply": reply}
     
 @app.post("/api/job-details")
+@profile_request
 def get_job_details(req: JobDetailRequest):
     try:
         if not groq_api_key:
@@ -647,4 +677,30 @@ async def get_weekly_challenge(request_data: dict):
                 {"day": "Day 1-3", "title": "Basic Concepts", "desc": "Read introductory articles."},
                 {"day": "Day 4-7", "title": "Mini Project", "desc": "Apply what you learned."}
             ]
-        }}
\ No newline at end of file
+        }}
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def require_admin(token):
+    if not ADMIN_TOKEN or not token or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+@app.get("/admin/profiler")
+def get_profiler_status(x_admin_token: str = Header(None)):
+    require_admin(x_admin_token)
+    return {"success": True, "profiler": profiler.status()}
+
+@app.post("/admin/profiler")
+def configure_profiler(req: ProfilerConfigRequest, x_admin_token: str = Header(None)):
+    require_admin(x_admin_token)
+    status = profiler.configure(enabled=req.enabled, threshold_ms=req.threshold_ms, interval_ms=req.interval_ms)
+    return {"success": True, "profiler": status}
+
+@app.get("/admin/profiler/captures/{filename}")
+def download_profile(filename: str, x_admin_token: str = Header(None)):
+    require_admin(x_admin_token)
+    path = os.path.join(profiler.output_dir, os.path.basename(filename))
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    with open(path) as f:
+        return PlainTextResponse(f.read())
@@ -0,0 +1,175 @@
+import functools
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+
+class SlowRequestProfiler:
+    """Stack-sampling profiler for slow requests, built on sys._current_frames().
+
+    While disabled, a profiled endpoint only pays for one attribute check and
+    no sampler thread exists. While enabled, one daemon thread samples the
+    threads that are currently serving profiled requests, and any request
+    slower than `threshold_ms` is written out as a collapsed-stack file that
+    flamegraph.pl, speedscope or inferno can render directly.
+    """
+
+    def __init__(self, threshold_ms=500, interval_ms=5, max_captures=50, output_dir=PROFILE_DIR):
+        self.enabled = False
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self.output_dir = output_dir
+        self.captures = deque(maxlen=max_captures)
+        self._active = {}
+        self._lock = threading.Lock()
+        # Serializes enable/disable. Separate from _lock because _shutdown
+        # joins the sampler, which itself takes _lock.
+        self._config_lock = threading.Lock()
+        self._capture_ids = itertools.count(1)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def configure(self, enabled=None, threshold_ms=None, interval_ms=None):
+        with self._config_lock:
+            if threshold_ms is not None:
+                self.threshold_ms = max(0, int(threshold_ms))
+            if interval_ms is not None:
+                self.interval_ms = max(1, int(interval_ms))
+            if enabled is True and not self.enabled:
+                self._start()
+            elif enabled is False and self.enabled:
+                self._shutdown()
+            return self.status()
+
+    def status(self):
+        return {
+            "enabled": self.enabled,
+            "threshold_ms": self.threshold_ms,
+            "interval_ms": self.interval_ms,
+            "output_dir": os.path.abspath(self.output_dir),
+            "captures": self._capture_list(),
+        }
+
+    def _capture_list(self):
+        with self._lock:
+            return list(self.captures)
+
+    def _start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="slow-request-profiler", daemon=True)
+        self._thread.start()
+        self.enabled = True
+
+    def _shutdown(self):
+        self.enabled = False
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        with self._lock:
+            self._active.clear()
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval_ms / 1000.0):
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            stacks = [(thread_id, collapse_stack(frames[thread_id])) for thread_id in active if thread_id in frames]
+            # Counters are only touched under the lock, so end() can snapshot
+            # them safely, and samples after end() are dropped.
+            with self._lock:
+                for thread_id, stack in stacks:
+                    samples = self._active.get(thread_id)
+                    # A reused worker thread may already serve a new request.
+                    if samples is not None and samples is active[thread_id]:
+                        samples[stack] += 1
+
+    def begin(self):
+        samples = Counter()
+        with self._lock:
+            self._active[threading.get_ident()] = samples
+        return samples
+
+    def end(self, name, samples, elapsed_ms):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+            samples = Counter(samples)
+        if elapsed_ms < self.threshold_ms or not samples:
+            return None
+
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        filename = f"{stamp}-{next(self._capture_ids):06d}_{name}_{int(elapsed_ms)}ms.folded"
+        path = os.path.join(self.output_dir, filename)
+        try:
+            with open(path, "w") as f:
+                for stack, count in samples.most_common():
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            print("Profiler Error:", e)
+            return None
+
+        capture = {
+            "file": filename,
+            "endpoint": name,
+            "elapsed_ms": round(elapsed_ms, 1),
+            "samples": sum(samples.values()),
+        }
+        # Only the newest max_captures files are kept on disk, matching what
+        # /admin/profiler lists.
+        evicted = None
+        with self._lock:
+            if len(self.captures) == self.captures.maxlen:
+                evicted = self.captures.popleft()
+            self.captures.append(capture)
+        if evicted is not None:
+            try:
+                os.remove(os.path.join(self.output_dir, evicted["file"]))
+            except OSError as e:
+                print("Profiler Error:", e)
+        return path
+
+
+def collapse_stack(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    stack.reverse()
+    return ";".join(stack)
+
+
+profiler = SlowRequestProfiler(
+    threshold_ms=int(os.getenv("PROFILE_THRESHOLD_MS", "500")),
+    interval_ms=int(os.getenv("PROFILE_INTERVAL_MS", "5")),
+)
+
+
+def profile_request(func):
+    # Only for sync endpoints: FastAPI runs them in a worker thread, so the
+    # sampled thread is doing nothing but this request.
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+
+        samples = profiler.begin()
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # The profiler must never fail the request it is measuring.
+            try:
+                profiler.end(func.__name__, samples, (time.perf_counter() - start) * 1000)
+            except Exception as e:
+                print("Profiler Error:", e)
+
+    return wrapper
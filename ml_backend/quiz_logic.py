@@ -0,0 +1,62 @@
+import numpy as np
+
+CATEGORIES = ["Realistic", "Investigative", "Artistic", "Social", "Enterprising", "Conventional"]
+BASE_STEPS = len(CATEGORIES)
+TOTAL_STEPS = 20
+
+# How the onboarding page turns a 1-5 rating into state (handleAnswer in
+# app/onboarding/page.tsx). Keep these in sync with the frontend.
+BASE_SCORE_PER_RATING = 2
+PREF_DELTAS = {1: -20, 2: -10, 3: 0, 4: 15, 5: 30}
+
+# All functions below work on batches (one row per quiz session) so the API
+# and the offline simulator share exactly the same step logic.
+
+def derive_personality_traits(riasec):
+    r, i_trait, a, s, e, c_trait = np.asarray(riasec, dtype=np.float64).T
+    openness = np.minimum(10, (a + i_trait) / 2 + 3)
+    conscientiousness = np.minimum(10, c_trait + 4)
+    extraversion = np.minimum(10, (e + s) / 2 + 2)
+    agreeableness = np.minimum(10, s + 5)
+    neuroticism = np.full_like(r, 4)
+    return np.column_stack([openness, conscientiousness, extraversion, agreeableness, neuroticism])
+
+
+def build_features(riasec):
+    riasec = np.asarray(riasec, dtype=np.float64)
+    return np.hstack([riasec, derive_personality_traits(riasec)])
+
+
+def calibrate_probabilities(probabilities, prefs):
+    # Each liked/disliked adaptive answer scales that cluster by 1.15 / 0.8
+    # per preference point.
+    prefs = np.asarray(prefs, dtype=np.float64)
+    multiplier = np.where(prefs < 0, 0.8 ** np.abs(prefs), 1.15 ** prefs)
+    return probabilities * multiplier
+
+
+def raw_confidence_scores(calibrated, best_idx):
+    rows = np.arange(len(calibrated))
+    total = calibrated.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total == 0, 85.5, calibrated[rows, best_idx] / total * 100)
+
+
+def confidence_scores(calibrated, best_idx, classes):
+    percentage = raw_confidence_scores(calibrated, best_idx)
+
+    # Cap near-certain results just under 98% with a small per-cluster offset.
+    noise = np.array([(len(cls_name) % 15) / 10.0 for cls_name in classes])[best_idx]
+    percentage = np.where(percentage > 98.0, 96.8 + noise, percentage)
+    return np.round(percentage, 1)
+
+
+def predict_clusters(rf_model, riasec, prefs):
+    """Return (best class index, calibrated probabilities, confidence) per session.
+
+    `prefs` must be aligned with rf_model.classes_.
+    """
+    probabilities = rf_model.predict_proba(build_features(riasec))
+    calibrated = calibrate_probabilities(probabilities, prefs)
+    best_idx = np.argmax(calibrated, axis=1)
+    return best_idx, calibrated, confidence_scores(calibrated, best_idx, rf_model.classes_)
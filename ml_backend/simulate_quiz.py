@@ -0,0 +1,141 @@
+import argparse
+import time
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+from quiz_logic import CATEGORIES, BASE_STEPS, TOTAL_STEPS, BASE_SCORE_PER_RATING, PREF_DELTAS, predict_clusters, raw_confidence_scores
+from streaming import TARGET
+
+RIASEC = ["R", "I", "A", "S", "E", "C"]
+
+parser = argparse.ArgumentParser(description="Simulate the 20-step adaptive quiz with virtual students.")
+parser.add_argument("--students", type=int, default=20_000)
+parser.add_argument("--batch-size", type=int, default=5_000)
+parser.add_argument("--noise", type=float, default=0.7, help="Std-dev of answer noise, in rating points.")
+parser.add_argument("--true-affinity", type=float, default=None,
+                    help="Fixed mean rating (1-5) for questions about the student's own cluster. "
+                         "Default: same distance model as every other cluster.")
+parser.add_argument("--model", default="apnidisha_model.pkl")
+parser.add_argument("--data", default="apnidisha_mega_dataset.csv")
+parser.add_argument("--seed", type=int, default=42)
+args = parser.parse_args()
+
+# The model is fitted on DataFrames; predict_career_adaptive passes plain arrays too.
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+print("Starting ApniDisha Adaptive Quiz Simulation...")
+rf_model = joblib.load(args.model)
+classes = rf_model.classes_
+df = pd.read_csv(args.data)
+df = df[df[TARGET].isin(classes)]
+
+# Each virtual student is a real profile from the dataset, so its cluster is
+# the ground truth the quiz should converge to.
+centroids = df.groupby(TARGET)[RIASEC].mean().reindex(classes).to_numpy()
+own_dist = np.linalg.norm(df[RIASEC].to_numpy() - centroids[np.searchsorted(classes, df[TARGET])], axis=1)
+dist_scale = np.median(own_dist) or 1.0
+rng = np.random.default_rng(args.seed)
+
+
+def answer(mean_rating):
+    noisy = mean_rating + rng.normal(0, args.noise, size=mean_rating.shape)
+    return np.clip(np.rint(noisy), 1, 5).astype(int)
+
+
+def simulate_batch(traits, true_idx):
+    n = len(true_idx)
+    rows = np.arange(n)
+
+    # Steps 1-6: one base question per RIASEC category, rated 1-5 from the
+    # student's own 1-10 trait.
+    scores = answer(traits / 2.0) * BASE_SCORE_PER_RATING
+
+    # How much a student likes the cluster they are asked about falls off with
+    # the distance between their traits and that cluster's average profile.
+    # The true cluster gets no special treatment unless --true-affinity is set.
+    dist = np.linalg.norm(traits[:, None, :] - centroids[None, :, :], axis=2)
+    affinity = 1.0 + 4.0 * np.exp(-dist / (2 * dist_scale))
+    if args.true_affinity is not None:
+        affinity[rows, true_idx] = args.true_affinity
+
+    delta_lookup = np.zeros(6, dtype=np.int64)
+    for rating, delta in PREF_DELTAS.items():
+        delta_lookup[rating] = delta
+
+    prefs = np.zeros((n, len(classes)))
+    correct_by_step = []
+    raw_confidence = None
+
+    # Steps 7-20 ask about the current prediction (the Groq question text has
+    # no effect on state, so it is skipped); step 21 returns the final result.
+    for step in range(BASE_STEPS + 1, TOTAL_STEPS + 2):
+        best_idx, calibrated, confidence = predict_clusters(rf_model, scores, prefs)
+        correct_by_step.append(best_idx == true_idx)
+        if step > TOTAL_STEPS:
+            raw_confidence = raw_confidence_scores(calibrated, best_idx)
+            break
+        ratings = answer(affinity[rows, best_idx])
+        prefs[rows, best_idx] += delta_lookup[ratings]
+
+    return np.array(correct_by_step), confidence, raw_confidence
+
+
+profiles = df.sample(n=args.students, replace=True, random_state=args.seed)
+all_traits = profiles[RIASEC].to_numpy(dtype=np.float64)
+all_true = np.searchsorted(classes, profiles[TARGET].to_numpy())
+
+correct_chunks, confidence_chunks, raw_chunks = [], [], []
+wall_start = time.perf_counter()
+cpu_start = time.process_time()
+
+for start in range(0, args.students, args.batch_size):
+    end = start + args.batch_size
+    correct, confidence, raw_confidence = simulate_batch(all_traits[start:end], all_true[start:end])
+    correct_chunks.append(correct)
+    confidence_chunks.append(confidence)
+    raw_chunks.append(raw_confidence)
+
+cpu_seconds = time.process_time() - cpu_start
+wall_seconds = time.perf_counter() - wall_start
+
+correct = np.hstack(correct_chunks)
+confidence = np.hstack(confidence_chunks)
+raw_confidence = np.hstack(raw_chunks)
+final_correct = correct[-1]
+
+# Convergence step: the first step from which the prediction stays on the
+# true cluster until the end of the quiz.
+stays_correct = np.flip(np.logical_and.accumulate(np.flip(correct, axis=0), axis=0), axis=0)
+first_stable = np.argmax(stays_correct, axis=0) + BASE_STEPS + 1
+converged = stays_correct[-1]
+
+print("\n" + "="*50)
+print(f"SIMULATED SESSIONS: {args.students:,} (answer noise {args.noise})")
+if args.true_affinity is None:
+    print("ANSWER MODEL: rating = 1 + 4*exp(-distance / (2*median own-cluster distance)), same for every cluster")
+else:
+    print(f"ANSWER MODEL: own cluster rated {args.true_affinity} on average, others by trait distance")
+print("Virtual students follow this model, so these numbers compare quiz-logic changes; they are not real quiz accuracy.")
+print(f"FINAL ACCURACY (step {TOTAL_STEPS + 1}): {final_correct.mean() * 100:.2f}%")
+print(f"BASE-ONLY ACCURACY (step {BASE_STEPS + 1}): {correct[0].mean() * 100:.2f}%")
+print("="*50)
+
+print("\n ACCURACY BY STEP:")
+for offset, step_correct in enumerate(correct):
+    print(f"   step {BASE_STEPS + 1 + offset:>2}: {step_correct.mean() * 100:6.2f}%")
+
+print("\n CONVERGENCE:")
+if converged.any():
+    print(f"   Mean step of stable correct prediction: {first_stable[converged].mean():.1f}")
+    print(f"   Median step of stable correct prediction: {np.median(first_stable[converged]):.0f}")
+print(f"   Sessions that never settle on the true cluster: {(~converged).mean() * 100:.2f}%")
+
+print("\n CONFIDENCE:")
+print(f"   Mean reported confidence: {confidence.mean():.1f}% (correct {confidence[final_correct].mean() if final_correct.any() else 0:.1f}%, "
+      f"wrong {confidence[~final_correct].mean() if (~final_correct).any() else 0:.1f}%)")
+print(f"   Sessions clamped above 98%: {(raw_confidence > 98.0).mean() * 100:.2f}%")
+
+print("\n COST:")
+print(f"   CPU time per session: {cpu_seconds / args.students * 1000:.3f} ms")
+print(f"   Throughput: {args.students / wall_seconds:,.0f} sessions/sec ({wall_seconds:.1f}s wall)")
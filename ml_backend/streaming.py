@@ -0,0 +1,190 @@
+import pickle
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+FEATURES = ["R", "I", "A", "S", "E", "C", "Openness", "Conscientiousness", "Extraversion", "Agreeableness", "Neuroticism"]
+TARGET = "career_cluster"
+
+
+def iter_chunks(path, chunk_size=100_000):
+    # float32 is what sklearn converts to internally, so a chunk is only ever
+    # held once in memory.
+    dtypes = {f: np.float32 for f in FEATURES}
+    dtypes[TARGET] = "category"
+    for chunk in pd.read_csv(path, usecols=FEATURES + [TARGET], dtype=dtypes, chunksize=chunk_size):
+        yield chunk[FEATURES], chunk[TARGET].astype(str).to_numpy()
+
+
+def split_chunks(chunks, test_size=0.2, random_state=42, part="train"):
+    # Re-reading the file with the same seed reproduces the same split, so
+    # train and test passes never need to keep the held-out rows around.
+    rng = np.random.default_rng(random_state)
+    for X, y in chunks:
+        is_test = rng.random(len(y)) < test_size
+        keep = is_test if part == "test" else ~is_test
+        yield X[keep], y[keep]
+
+
+def peak_memory_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux (bytes on macOS, close enough for a benchmark).
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Stream-mode defaults. Only the sampled rows are ever fitted, so memory and
+# model size depend on these numbers and not on the size of the file. Each
+# tree has at most 2 * sample_size / min_samples_leaf nodes.
+STREAM_SAMPLE_SIZE = 250_000
+STREAM_MAX_TREES = 100
+STREAM_MAX_DEPTH = 16
+STREAM_MIN_SAMPLES_LEAF = 20
+
+
+def add_stream_arguments(parser):
+    parser.add_argument("--stream", action="store_true", help="Read the dataset in chunks with bounded memory.")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--sample-size", type=int, default=STREAM_SAMPLE_SIZE,
+                        help="Rows sampled from the stream for training (stream mode).")
+    parser.add_argument("--max-trees", type=int, default=STREAM_MAX_TREES, help="Number of trees (stream mode).")
+    parser.add_argument("--max-depth", type=int, default=None,
+                        help=f"Tree depth limit (default: none, {STREAM_MAX_DEPTH} in stream mode).")
+    parser.add_argument("--min-samples-leaf", type=int, default=None,
+                        help=f"Minimum rows per leaf (default: 1, {STREAM_MIN_SAMPLES_LEAF} in stream mode).")
+
+
+def stream_forest_options(args):
+    return {
+        "sample_size": args.sample_size,
+        "max_trees": args.max_trees,
+        "max_depth": args.max_depth or STREAM_MAX_DEPTH,
+        "min_samples_leaf": args.min_samples_leaf or STREAM_MIN_SAMPLES_LEAF,
+    }
+
+
+def reservoir_sample(chunks, sample_size, random_state=42):
+    """Uniform random sample of `sample_size` rows from a stream of chunks.
+
+    Every row gets a random key and the rows with the smallest keys are kept,
+    so memory stays at one chunk plus the sample and sorted files are sampled
+    as fairly as shuffled ones.
+    """
+    rng = np.random.default_rng(random_state)
+    X_sample = np.empty((0, len(FEATURES)), dtype=np.float32)
+    y_sample = np.empty(0, dtype=object)
+    keys = np.empty(0)
+    stats = {"rows": 0, "chunks": 0, "clusters_seen": set()}
+
+    for X, y in chunks:
+        X_sample = np.vstack([X_sample, X.to_numpy(dtype=np.float32)])
+        y_sample = np.concatenate([y_sample, y.astype(object)])
+        keys = np.concatenate([keys, rng.random(len(y))])
+        if len(keys) > sample_size:
+            keep = np.argpartition(keys, sample_size)[:sample_size]
+            X_sample, y_sample, keys = X_sample[keep], y_sample[keep], keys[keep]
+
+        stats["rows"] += len(y)
+        stats["chunks"] += 1
+        stats["clusters_seen"].update(np.unique(y))
+        print(f"   chunk {stats['chunks']}: {stats['rows']:,} rows read, {len(y_sample):,} sampled")
+
+    return pd.DataFrame(X_sample, columns=FEATURES), y_sample, stats
+
+
+def model_size_mb(rf_model):
+    return sum(len(pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL)) for tree in rf_model.estimators_) / 1e6
+
+
+def fit_forest_streaming(chunks, sample_size=STREAM_SAMPLE_SIZE, max_trees=STREAM_MAX_TREES,
+                         max_depth=STREAM_MAX_DEPTH, min_samples_leaf=STREAM_MIN_SAMPLES_LEAF, random_state=42):
+    """Fit a size-bounded random forest on a uniform sample of a streamed dataset.
+
+    The result is a plain single-threaded RandomForestClassifier and loads in
+    main.py unchanged.
+    All clusters in the sample are fitted together, so class labels always line up.
+    """
+    start = time.perf_counter()
+    X, y, stats = reservoir_sample(chunks, sample_size, random_state)
+    if stats["rows"] == 0:
+        raise ValueError("No rows found in the dataset.")
+    stats["read_seconds"] = time.perf_counter() - start
+
+    rf_model = RandomForestClassifier(n_estimators=max_trees, max_depth=max_depth, min_samples_leaf=min_samples_leaf,
+                                      random_state=random_state, n_jobs=-1)
+    rf_model.fit(X, y)
+    # Parallel only for training: the saved model must predict serially like
+    # the baseline one, since /predict-career scores a single row per request.
+    rf_model.n_jobs = None
+
+    stats["sampled_rows"] = len(y)
+    stats["missing_clusters"] = sorted(stats.pop("clusters_seen") - set(rf_model.classes_))
+    stats["seconds"] = time.perf_counter() - start
+    stats["fit_seconds"] = stats["seconds"] - stats["read_seconds"]
+    stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    stats["peak_memory_mb"] = peak_memory_mb()
+    stats["model_size_mb"] = model_size_mb(rf_model)
+    return rf_model, stats
+
+
+def print_training_summary(stats):
+    print(f"   Read {stats['rows']:,} rows in {stats['chunks']} chunks, trained on a sample of {stats['sampled_rows']:,} "
+          f"in {stats['seconds']:.1f}s ({stats['rows_per_sec']:,.0f} rows/sec, fit {stats['fit_seconds']:.1f}s).")
+    print(f"   Peak memory {stats['peak_memory_mb'] or 0:.0f} MB, model size {stats['model_size_mb']:.1f} MB.")
+    if stats["missing_clusters"]:
+        print(f"   WARNING: clusters missing from the sample, raise --sample-size: {', '.join(stats['missing_clusters'])}")
+
+
+def evaluate_streaming(rf_model, chunks):
+    classes = rf_model.classes_
+    cm = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    rows = 0
+    unseen_rows = 0
+    start = time.perf_counter()
+
+    for X, y in chunks:
+        known = np.isin(y, classes)
+        unseen_rows += int((~known).sum())
+        X, y = X[known], y[known]
+        if len(y) == 0:
+            continue
+        y_pred = rf_model.predict(X)
+        # classes_ is sorted, so searchsorted maps labels to matrix rows.
+        actual = np.searchsorted(classes, y)
+        predicted = np.searchsorted(classes, y_pred)
+        np.add.at(cm, (actual, predicted), 1)
+        rows += len(y)
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "rows": rows,
+        "unseen_rows": unseen_rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds else 0.0,
+        "peak_memory_mb": peak_memory_mb(),
+    }
+    return cm, stats
+
+
+def report_from_confusion(cm, classes):
+    # Same layout as sklearn's classification_report, built from the
+    # accumulated matrix because the predictions are never held in memory.
+    width = max(len(c) for c in classes)
+    lines = [f"{'':>{width}}  precision    recall  f1-score   support", ""]
+    for i, cls_name in enumerate(classes):
+        tp = cm[i, i]
+        precision = tp / cm[:, i].sum() if cm[:, i].sum() else 0.0
+        recall = tp / cm[i, :].sum() if cm[i, :].sum() else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        lines.append(f"{cls_name:>{width}}  {precision:9.2f} {recall:9.2f} {f1:9.2f} {cm[i, :].sum():9d}")
+    total = cm.sum()
+    accuracy = np.trace(cm) / total if total else 0.0
+    lines.append("")
+    lines.append(f"{'accuracy':>{width}}  {'':9} {'':9} {accuracy:9.2f} {total:9d}")
+    return "\n".join(lines)
@@ -1,19 +1,33 @@
+import argparse
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 import joblib
+from streaming import FEATURES, TARGET, iter_chunks, fit_forest_streaming, add_stream_arguments, stream_forest_options, print_training_summary
 
-print("🚀 Step 1: Loading the new Real-World Dataset...")
-df = pd.read_csv("apnidisha_mega_dataset.csv")
+parser = argparse.ArgumentParser(description="Train the ApniDisha career cluster model.")
+parser.add_argument("--data", default="apnidisha_mega_dataset.csv")
+parser.add_argument("--output", default="apnidisha_model.pkl")
+add_stream_arguments(parser)
+args = parser.parse_args()
 
-X = df[["R", "I", "A", "S", "E", "C", "Openness", "Conscientiousness", "Extraversion", "Agreeableness", "Neuroticism"]]
+if args.stream:
+    print(f"🚀 Step 1+2: Streaming '{args.data}' in chunks of {args.chunk_size:,} rows...")
+    rf_model, stats = fit_forest_streaming(iter_chunks(args.data, args.chunk_size), **stream_forest_options(args))
+    print_training_summary(stats)
+else:
+    print("🚀 Step 1: Loading the new Real-World Dataset...")
+    df = pd.read_csv(args.data)
 
-y = df["career_cluster"]
+    X = df[FEATURES]
 
-print("🧠 Step 2: Training the AI Brain (Random Forest)...")
-rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
-rf_model.fit(X, y)
+    y = df[TARGET]
+
+    print("🧠 Step 2: Training the AI Brain (Random Forest)...")
+    rf_model = RandomForestClassifier(n_estimators=100, max_depth=args.max_depth,
+                                      min_samples_leaf=args.min_samples_leaf or 1, random_state=42)
+    rf_model.fit(X, y)
 
 print("💾 Step 3: Saving the new smart brain...")
-joblib.dump(rf_model, "apnidisha_model.pkl")
+joblib.dump(rf_model, args.output)
 
-print("✅ SUCCESS! New 'apnidisha_model.pkl' created and ready for ApniDisha backend!")
\ No newline at end of file
+print(f"✅ SUCCESS! New '{args.output}' created and ready for ApniDisha backend!")